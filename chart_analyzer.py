@@ -3,7 +3,7 @@ from models import QueryResult, ChartConfig
 
 class ChartAnalyzer:
     def suggest_chart(self, question: str, query_result: QueryResult) -> Optional[ChartConfig]:
-        if not query_result.success or not query_result.data:
+        if not query_result.success or query_result.data.empty:
             return None
         
         headers = query_result.headers
@@ -63,8 +63,8 @@ class ChartAnalyzer:
     
     def _get_numeric_columns(self, query_result: QueryResult) -> List[str]:
         numeric_cols = []
-        for i, header in enumerate(query_result.headers):
-            sample_values = [row[i] for row in query_result.data[:10] if row[i] is not None]
+        for header in query_result.headers:
+            sample_values = query_result.data[header].iloc[:10].dropna().tolist()
             if sample_values:
                 try:
                     [float(val) for val in sample_values[:3]]
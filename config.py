@@ -10,12 +10,14 @@ class Config:
         self.database_path = 'argo_floats.db'
         self.semantic_model_path = 'argo_semantic_model.yaml'
         self.gemini_model = "gemini-2.0-flash-exp"
+        self.max_result_rows = 10000
         
         if not self.google_api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
     
     def load_semantic_model(self):
+        # Parsed once per process (the orchestrator is a cached resource); the C loader is faster when available
         with open(self.semantic_model_path, 'r') as file:
-            return yaml.safe_load(file)
+            return yaml.load(file, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
 
 config = Config()
\ No newline at end of file
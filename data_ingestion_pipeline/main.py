@@ -5,13 +5,103 @@ Based on actual data structure analysis - uses prof.nc files efficiently
 """
 
 import os
+import json
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from argopy import gdacfs
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import xarray as xr
+import logging
 import warnings
 warnings.filterwarnings('ignore')
 
+log = logging.getLogger(__name__)
+
+# Local copy of fetched GDAC files, so reruns read meta/prof files from disk
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "argo_cache")
+
+# Which meta/prof files each float has; GDAC listings change rarely, so probes are reused for a day
+FLOAT_INDEX_PATH = os.path.join(CACHE_DIR, "float_index.json")
+FLOAT_INDEX_TTL = 24 * 60 * 60
+
+CSV_DIR = "../csv_files"
+MEASUREMENTS_PATH = os.path.join(CSV_DIR, "MEASUREMENTS.csv")
+
+# Core metadata fields read from meta.nc
+FLOAT_METADATA_FIELDS = [
+    'PLATFORM_NUMBER', 'PLATFORM_TYPE', 'PLATFORM_MAKER', 'FLOAT_SERIAL_NO',
+    'PROJECT_NAME', 'PI_NAME', 'LAUNCH_DATE', 'LAUNCH_LATITUDE', 'LAUNCH_LONGITUDE',
+    'START_DATE', 'END_MISSION_DATE', 'BATTERY_TYPE', 'FIRMWARE_VERSION',
+    'DEPLOYMENT_PLATFORM', 'DEPLOYMENT_CRUISE_ID', 'FLOAT_OWNER', 
+    'OPERATING_INSTITUTION', 'DATA_CENTRE', 'WMO_INST_TYPE'
+]
+
+# Profile-level variables (1D arrays indexed by N_PROF)
+PROFILE_VARIABLES = {
+    'CYCLE_NUMBER': 'cycle_number', 
+    'JULD': 'date_time', 
+    'LATITUDE': 'latitude', 
+    'LONGITUDE': 'longitude',
+    'POSITION_QC': 'position_qc', 
+    'DIRECTION': 'direction', 
+    'DATA_MODE': 'data_mode',
+    'PROFILE_PRES_QC': 'profile_pres_qc', 
+    'PROFILE_TEMP_QC': 'profile_temp_qc', 
+    'PROFILE_PSAL_QC': 'profile_psal_qc'
+}
+
+# Measurement variables (2D arrays indexed by N_PROF, N_LEVELS)
+MEASUREMENT_VARIABLES = {
+    'PRES': 'pressure', 
+    'TEMP': 'temperature', 
+    'PSAL': 'salinity',
+    'PRES_QC': 'pressure_qc', 
+    'TEMP_QC': 'temperature_qc', 
+    'PSAL_QC': 'salinity_qc',
+    'PRES_ADJUSTED': 'pressure_adjusted', 
+    'TEMP_ADJUSTED': 'temperature_adjusted', 
+    'PSAL_ADJUSTED': 'salinity_adjusted',
+    'PRES_ADJUSTED_QC': 'pressure_adjusted_qc',
+    'TEMP_ADJUSTED_QC': 'temperature_adjusted_qc', 
+    'PSAL_ADJUSTED_QC': 'salinity_adjusted_qc'
+}
+
+# Extra variables for floats carrying an oxygen sensor
+DOXY_PROFILE_VARIABLES = {'PROFILE_DOXY_QC': 'profile_oxygen_qc'}
+DOXY_MEASUREMENT_VARIABLES = {
+    'DOXY': 'oxygen',
+    'DOXY_QC': 'oxygen_qc', 
+    'DOXY_ADJUSTED': 'oxygen_adjusted',
+    'DOXY_ADJUSTED_QC': 'oxygen_adjusted_qc'
+}
+
+# Fixed MEASUREMENTS.csv layout so per-float appends line up whether or not a float has DOXY
+MEASUREMENT_COLUMNS = ['FLOAT_ID', 'PROFILE_NUMBER', 'LEVEL', *MEASUREMENT_VARIABLES, *DOXY_MEASUREMENT_VARIABLES]
+
+# History and calibration blocks of prof.nc are never read; skipping them at open time
+# avoids decoding the largest N_HISTORY / N_CALIB arrays (names absent from a file are ignored)
+UNUSED_PROF_VARIABLES = [
+    'HISTORY_INSTITUTION', 'HISTORY_STEP', 'HISTORY_SOFTWARE', 'HISTORY_SOFTWARE_RELEASE',
+    'HISTORY_REFERENCE', 'HISTORY_DATE', 'HISTORY_ACTION', 'HISTORY_PARAMETER',
+    'HISTORY_START_PRES', 'HISTORY_STOP_PRES', 'HISTORY_PREVIOUS_VALUE', 'HISTORY_QCTEST',
+    'PARAMETER', 'SCIENTIFIC_CALIB_EQUATION', 'SCIENTIFIC_CALIB_COEFFICIENT',
+    'SCIENTIFIC_CALIB_COMMENT', 'SCIENTIFIC_CALIB_DATE', 'STATION_PARAMETERS',
+    'PRES_ADJUSTED_ERROR', 'TEMP_ADJUSTED_ERROR', 'PSAL_ADJUSTED_ERROR', 'DOXY_ADJUSTED_ERROR'
+]
+
+_FS = None
+
+def get_fs():
+    """Shared GDAC file system, created on first use so its HTTP session is reused"""
+    global _FS
+    if _FS is None:
+        _FS = gdacfs("https://data-argo.ifremer.fr", cache=True, cachedir=CACHE_DIR)
+    return _FS
+
 def safe_extract_scalar(data_array):
     """Safely extract scalar values from xarray DataArray"""
     try:
@@ -20,8 +110,13 @@ def safe_extract_scalar(data_array):
         
         value = data_array.values
         
-        # Handle different data types
-        if hasattr(value, 'item'):
+        # Char arrays (one byte per element) are joined and decoded in a single call;
+        # .item() only applies to single-element arrays
+        if isinstance(value, np.ndarray) and value.size > 1:
+            flat = value.ravel()
+            if flat.dtype.kind == 'S' or isinstance(flat[0], bytes):
+                value = b''.join(flat.astype('S').tolist()).decode('utf-8')
+        elif hasattr(value, 'item'):
             value = value.item()
         
         # Convert bytes to string and clean
@@ -29,12 +124,8 @@ def safe_extract_scalar(data_array):
             value = value.decode('utf-8').strip()
         elif isinstance(value, str):
             value = value.strip()
-        elif isinstance(value, (np.ndarray, list)) and len(value) > 0:
-            if isinstance(value[0], bytes):
-                # Join byte arrays and decode
-                value = ''.join([b.decode('utf-8') if isinstance(b, bytes) else str(b) for b in value]).strip()
-            elif len(value) == 1:
-                value = value[0]
+        elif isinstance(value, list) and len(value) == 1:
+            value = value[0]
         
         # Handle NaN and empty values
         if pd.isna(value) or (isinstance(value, str) and (value == '' or value.lower() == 'nan')):
@@ -44,248 +135,278 @@ def safe_extract_scalar(data_array):
     except Exception:
         return None
 
-def safe_extract_array_value(data_array, indices):
-    """Safely extract single value from multidimensional array"""
-    try:
-        if data_array is None:
-            return None
-            
-        value = data_array.values[indices]
-        
-        # Handle scalar results
-        if np.isscalar(value):
-            if isinstance(value, bytes):
-                decoded = value.decode('utf-8').strip()
-                return decoded if decoded else None
-            elif pd.isna(value):
-                return None
-            else:
-                return float(value) if isinstance(value, (np.floating, float)) else value
-        
-        return value
-    except Exception:
-        return None
+def extract_column_values(values):
+    """Convert a 1D array of profile/level values, dispatching once on its dtype"""
+    kind = values.dtype.kind
+    
+    # Some backends hand char variables back as object arrays of bytes
+    if kind == 'O' and len(values) > 0 and isinstance(values[0], bytes):
+        values, kind = values.astype('S'), 'S'
+    
+    if kind == 'S':
+        values, kind = np.char.decode(values, 'utf-8'), 'U'
+    
+    if kind == 'U':
+        stripped = np.char.strip(values)
+        return np.where(stripped == '', None, stripped.astype(object))
+    
+    # Numeric and datetime columns pass through; NaN/NaT already mean "missing"
+    return values
 
 def extract_float_metadata(fs, float_id, dac="coriolis"):
     """Extract float metadata from meta.nc file"""
-    print(f"  📋 Extracting metadata for float {float_id}...")
+    log.info(f"  📋 Extracting metadata for float {float_id}...")
     
     meta_file_path = f"dac/{dac}/{float_id}/{float_id}_meta.nc"
     
     try:
         with fs.open_dataset(meta_file_path) as ds_meta:
-            # Core metadata fields
-            metadata_fields = [
-                'PLATFORM_NUMBER', 'PLATFORM_TYPE', 'PLATFORM_MAKER', 'FLOAT_SERIAL_NO',
-                'PROJECT_NAME', 'PI_NAME', 'LAUNCH_DATE', 'LAUNCH_LATITUDE', 'LAUNCH_LONGITUDE',
-                'START_DATE', 'END_MISSION_DATE', 'BATTERY_TYPE', 'FIRMWARE_VERSION',
-                'DEPLOYMENT_PLATFORM', 'DEPLOYMENT_CRUISE_ID', 'FLOAT_OWNER', 
-                'OPERATING_INSTITUTION', 'DATA_CENTRE', 'WMO_INST_TYPE'
-            ]
-            
             float_metadata = {'FLOAT_ID': float_id}
             
-            for field in metadata_fields:
+            for field in FLOAT_METADATA_FIELDS:
                 if field in ds_meta.variables:
                     value = safe_extract_scalar(ds_meta[field])
                     float_metadata[field] = value
                 else:
                     float_metadata[field] = None
         
-        print(f"    ✅ Metadata extracted")
+        log.info(f"    ✅ Metadata extracted for float {float_id}")
         return float_metadata
         
     except Exception as e:
-        print(f"    ❌ Error extracting metadata: {e}")
+        log.error(f"    ❌ Error extracting metadata for float {float_id}: {e}")
         # Return empty metadata record so processing continues
-        return {'FLOAT_ID': float_id, **{field: None for field in metadata_fields if 'field' in locals()}}
+        return {'FLOAT_ID': float_id, **{field: None for field in FLOAT_METADATA_FIELDS}}
 
 def extract_profile_and_measurement_data(fs, float_id, dac="coriolis", max_profiles=10):
     """Extract both profile info and measurements from prof.nc file"""
-    print(f"  🌊 Extracting data from prof.nc for float {float_id}...")
+    log.info(f"  🌊 Extracting data from prof.nc for float {float_id}...")
     
     prof_file_path = f"dac/{dac}/{float_id}/{float_id}_prof.nc"
     
     try:
-        with fs.open_dataset(prof_file_path) as ds_prof:
+        with fs.open_dataset(prof_file_path, xr_opts={'drop_variables': UNUSED_PROF_VARIABLES}) as ds_prof:
             n_profiles = ds_prof.dims.get('N_PROF', 0)
             n_levels = ds_prof.dims.get('N_LEVELS', 0)
             
             # Limit profiles to process
             profiles_to_process = min(n_profiles, max_profiles)
-            print(f"    📊 Processing {profiles_to_process}/{n_profiles} profiles, {n_levels} levels each")
-            
-            profile_data = []
-            measurements = []
+            log.info(f"    📊 Float {float_id}: processing {profiles_to_process}/{n_profiles} profiles, {n_levels} levels each")
             
-            # Profile-level variables (1D arrays indexed by N_PROF)
-            profile_vars = {
-                'CYCLE_NUMBER': 'cycle_number', 
-                'JULD': 'date_time', 
-                'LATITUDE': 'latitude', 
-                'LONGITUDE': 'longitude',
-                'POSITION_QC': 'position_qc', 
-                'DIRECTION': 'direction', 
-                'DATA_MODE': 'data_mode',
-                'PROFILE_PRES_QC': 'profile_pres_qc', 
-                'PROFILE_TEMP_QC': 'profile_temp_qc', 
-                'PROFILE_PSAL_QC': 'profile_psal_qc'
-            }
+            # Select the profiles up front so .values below only materializes those rows
+            ds_subset = ds_prof.isel(N_PROF=slice(0, profiles_to_process))
             
-            # Measurement variables (2D arrays indexed by N_PROF, N_LEVELS)
-            measurement_vars = {
-                'PRES': 'pressure', 
-                'TEMP': 'temperature', 
-                'PSAL': 'salinity',
-                'PRES_QC': 'pressure_qc', 
-                'TEMP_QC': 'temperature_qc', 
-                'PSAL_QC': 'salinity_qc',
-                'PRES_ADJUSTED': 'pressure_adjusted', 
-                'TEMP_ADJUSTED': 'temperature_adjusted', 
-                'PSAL_ADJUSTED': 'salinity_adjusted',
-                'PRES_ADJUSTED_QC': 'pressure_adjusted_qc',
-                'TEMP_ADJUSTED_QC': 'temperature_adjusted_qc', 
-                'PSAL_ADJUSTED_QC': 'salinity_adjusted_qc'
-            }
+            profile_vars = PROFILE_VARIABLES
+            measurement_vars = MEASUREMENT_VARIABLES
             
             # Add DOXY variables if they exist
             if 'DOXY' in ds_prof.variables:
-                measurement_vars.update({
-                    'DOXY': 'oxygen',
-                    'DOXY_QC': 'oxygen_qc', 
-                    'DOXY_ADJUSTED': 'oxygen_adjusted',
-                    'DOXY_ADJUSTED_QC': 'oxygen_adjusted_qc'
-                })
-                profile_vars['PROFILE_DOXY_QC'] = 'profile_oxygen_qc'
+                profile_vars = {**PROFILE_VARIABLES, **DOXY_PROFILE_VARIABLES}
+                measurement_vars = {**MEASUREMENT_VARIABLES, **DOXY_MEASUREMENT_VARIABLES}
             
-            # Process each profile
-            for prof_idx in range(profiles_to_process):
-                # Extract profile-level information
-                profile_info = {
-                    'FLOAT_ID': float_id,
-                    'PROFILE_NUMBER': prof_idx + 1
+            # Profile-level table built column-wise from each variable's N_PROF array
+            profile_data = pd.DataFrame({
+                'FLOAT_ID': float_id,
+                'PROFILE_NUMBER': np.arange(1, profiles_to_process + 1, dtype=np.int32),
+                **{
+                    var_name: extract_column_values(ds_subset[var_name].values)
+                    if var_name in ds_prof.variables else np.nan
+                    for var_name in profile_vars
                 }
+            }, copy=False)
+            
+            # Extract measurements: each variable's (profile, level) array is loaded once and
+            # masked down to the levels that have pressure data, instead of per-cell lookups
+            measurements = pd.DataFrame()
+            prof_idx = np.array([], dtype=np.int64)
+            if 'PRES' in ds_prof.variables:
+                has_pressure = pd.notna(ds_subset['PRES'].values)
+                prof_idx, level_idx = np.nonzero(has_pressure)
                 
-                for var_name, col_name in profile_vars.items():
+                # Typed columns: int32 indices, and absent variables as NaN rather than object None
+                columns = {
+                    'FLOAT_ID': float_id,
+                    'PROFILE_NUMBER': (prof_idx + 1).astype(np.int32),
+                    'LEVEL': (level_idx + 1).astype(np.int32)
+                }
+                for var_name in measurement_vars:
                     if var_name in ds_prof.variables:
-                        value = safe_extract_array_value(ds_prof[var_name], prof_idx)
-                        profile_info[var_name] = value
+                        values = ds_subset[var_name].values[has_pressure]
+                        columns[var_name] = extract_column_values(values)
                     else:
-                        profile_info[var_name] = None
-                
-                profile_data.append(profile_info)
+                        columns[var_name] = np.nan
                 
-                # Extract measurements for this profile
-                profile_measurements = 0
-                for level_idx in range(n_levels):
-                    # Check if this level has pressure data (skip if not)
-                    if 'PRES' in ds_prof.variables:
-                        pres_val = safe_extract_array_value(ds_prof['PRES'], (prof_idx, level_idx))
-                        if pres_val is None or pd.isna(pres_val):
-                            continue  # Skip levels without pressure data
-                    else:
-                        continue
-                    
-                    # Create measurement record
-                    measurement_row = {
-                        'FLOAT_ID': float_id,
-                        'PROFILE_NUMBER': prof_idx + 1,
-                        'LEVEL': level_idx + 1,
-                        'PRES': pres_val
-                    }
-                    
-                    # Extract other measurement variables
-                    for var_name, col_name in measurement_vars.items():
-                        if var_name == 'PRES':  # Already handled above
-                            continue
-                            
-                        if var_name in ds_prof.variables:
-                            value = safe_extract_array_value(ds_prof[var_name], (prof_idx, level_idx))
-                            measurement_row[var_name] = value
-                        else:
-                            measurement_row[var_name] = None
-                    
-                    measurements.append(measurement_row)
-                    profile_measurements += 1
-                
-                print(f"    📈 Profile {prof_idx + 1}: {profile_measurements} measurements")
+                measurements = pd.DataFrame(columns, copy=False)
+            
+            # Per-profile detail is debug-level and emitted as one record per float
+            level_counts = np.bincount(prof_idx, minlength=profiles_to_process)
+            if profiles_to_process:
+                log.debug("\n".join(
+                    f"    📈 Profile {prof_number}: {profile_measurements} measurements"
+                    for prof_number, profile_measurements in enumerate(level_counts, 1)
+                ))
         
-        print(f"    ✅ Extracted {len(profile_data)} profiles, {len(measurements)} measurements")
+        log.info(f"    ✅ Float {float_id}: extracted {len(profile_data)} profiles, {len(measurements)} measurements")
         return profile_data, measurements
         
     except Exception as e:
-        print(f"    ❌ Error extracting data: {e}")
-        return [], []
+        log.error(f"    ❌ Error extracting data for float {float_id}: {e}")
+        return pd.DataFrame(), pd.DataFrame()
+
+def load_float_index():
+    """Load the cached float file index (empty if missing or unreadable)"""
+    try:
+        with open(FLOAT_INDEX_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_float_index(float_index):
+    """Persist the float file index for the next run"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(FLOAT_INDEX_PATH, 'w') as f:
+            json.dump(float_index, f)
+    except OSError as e:
+        log.warning(f"  ⚠️ Could not save float index: {e}")
 
-def check_float_exists(fs, float_id, dac="coriolis"):
-    """Check if float files exist"""
+def check_float_exists(fs, float_id, dac="coriolis", float_index=None):
+    """Check if float files exist, consulting the cached index before probing the GDAC"""
+    index_key = f"{dac}/{float_id}"
+    if float_index is not None:
+        entry = float_index.get(index_key)
+        if entry and time.time() - entry['ts'] < FLOAT_INDEX_TTL:
+            return len(entry['files']) > 0, entry['files']
+    
     files_to_check = [
         f"dac/{dac}/{float_id}/{float_id}_meta.nc",
         f"dac/{dac}/{float_id}/{float_id}_prof.nc"
     ]
     
-    existing_files = []
-    for file_path in files_to_check:
-        try:
-            fs.info(file_path)
-            existing_files.append(file_path.split('/')[-1])
-        except:
-            pass
+    try:
+        # One directory listing answers for both files instead of a probe per file
+        listing = fs.ls(f"dac/{dac}/{float_id}")
+        listed_names = {os.path.basename(str(entry['name'] if isinstance(entry, dict) else entry).rstrip('/'))
+                        for entry in listing}
+        existing_files = [file_path.split('/')[-1] for file_path in files_to_check
+                          if file_path.split('/')[-1] in listed_names]
+        # A completed listing is authoritative, including an empty answer
+        confirmed = True
+    except Exception:
+        # Missing directory or a store without listings: fall back to probing each file
+        existing_files = []
+        for file_path in files_to_check:
+            try:
+                fs.info(file_path)
+                existing_files.append(file_path.split('/')[-1])
+            except:
+                pass
+        # Failed probes cannot tell "absent" from a timeout or server error
+        confirmed = len(existing_files) > 0
+    
+    if float_index is not None and confirmed:
+        float_index[index_key] = {'files': existing_files, 'ts': time.time()}
     
     return len(existing_files) > 0, existing_files
 
-def process_multiple_floats(float_ids, dac="coriolis", max_profiles=10):
+def process_float(fs, float_id, dac="coriolis", max_profiles=10, float_index=None):
+    """Extract metadata, profiles and measurements for one float (None if unavailable)"""
+    log.info(f"\n🌊 PROCESSING FLOAT: {float_id}")
+    
+    # Check if float exists
+    exists, available_files = check_float_exists(fs, float_id, dac, float_index)
+    if not exists:
+        log.error(f"  ❌ Float {float_id} not found or no accessible files")
+        return None
+    
+    log.info(f"  📁 Available files for {float_id}: {', '.join(available_files)}")
+    
+    try:
+        # meta.nc downloads in the background while prof.nc is fetched and decoded
+        with ThreadPoolExecutor(max_workers=1) as meta_executor:
+            metadata_future = meta_executor.submit(extract_float_metadata, fs, float_id, dac)
+            
+            # Extract profile and measurement data
+            profile_data, measurements = extract_profile_and_measurement_data(fs, float_id, dac, max_profiles)
+            float_metadata = metadata_future.result()
+        
+        log.info(f"  ✅ Float {float_id} complete: {len(profile_data)} profiles, {len(measurements)} measurements")
+        return float_metadata, profile_data, measurements
+        
+    except Exception as e:
+        log.error(f"  ❌ Error processing float {float_id}: {e}")
+        return None
+
+def csv_arrow_type(arrow_type):
+    """Arrow type a column is written as: all-null columns as strings, timestamps in microseconds"""
+    if pa.types.is_null(arrow_type):
+        return pa.string()
+    if pa.types.is_timestamp(arrow_type):
+        return pa.timestamp('us', tz=arrow_type.tz)
+    return arrow_type
+
+def write_csv(df, path, append=False):
+    """Write a frame with Arrow's C++ CSV writer, optionally appending without a header"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = pa.schema([field.with_type(csv_arrow_type(field.type)) for field in table.schema])
+    write_header = not (append and os.path.exists(path))
+    
+    with open(path, 'ab' if append else 'wb') as sink:
+        pacsv.write_csv(table.cast(schema, safe=False), sink,
+                        write_options=pacsv.WriteOptions(include_header=write_header, batch_size=65536))
+
+def append_measurements_csv(measurements, measurements_path=MEASUREMENTS_PATH):
+    """Append one float's measurements to the measurements CSV, writing the header once"""
+    write_csv(measurements.reindex(columns=MEASUREMENT_COLUMNS), measurements_path, append=True)
+
+def process_multiple_floats(float_ids, dac="coriolis", max_profiles=10, max_workers=8):
     """Process multiple floats and extract all data"""
     print(f"🚀 ARGO DATA EXTRACTION STARTED")
     print(f"📊 Target: {len(float_ids)} floats, up to {max_profiles} profiles each")
     print("=" * 80)
     
-    # Initialize file system
-    fs = gdacfs("https://data-argo.ifremer.fr")
+    # Shared file system; worker threads reuse its connections
+    fs = get_fs()
     
-    # Storage for all data
+    # Storage for all data; measurements are streamed to disk instead of kept in memory
     all_float_metadata = []
     all_profile_data = []
-    all_measurements = []
+    measurement_count = 0
     
-    # Process each float
-    for i, float_id in enumerate(float_ids, 1):
-        print(f"\n🌊 PROCESSING FLOAT {i}/{len(float_ids)}: {float_id}")
-        print("-" * 60)
-        
-        # Check if float exists
-        exists, available_files = check_float_exists(fs, float_id, dac)
-        if not exists:
-            print(f"  ❌ Float {float_id} not found or no accessible files")
-            continue
-        
-        print(f"  📁 Available files: {', '.join(available_files)}")
+    os.makedirs(CSV_DIR, exist_ok=True)
+    if os.path.exists(MEASUREMENTS_PATH):
+        os.remove(MEASUREMENTS_PATH)
+    
+    float_index = load_float_index()
+    
+    # Floats are fetched concurrently (the work is HTTP round-trips); map keeps input order
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda float_id: process_float(fs, float_id, dac, max_profiles, float_index), float_ids)
         
-        try:
-            # Extract float metadata
-            float_metadata = extract_float_metadata(fs, float_id, dac)
-            all_float_metadata.append(float_metadata)
-            
-            # Extract profile and measurement data
-            profile_data, measurements = extract_profile_and_measurement_data(fs, float_id, dac, max_profiles)
-            all_profile_data.extend(profile_data)
-            all_measurements.extend(measurements)
+        for result in results:
+            if result is None:
+                continue
             
-            print(f"  ✅ Float {float_id} complete: {len(profile_data)} profiles, {len(measurements)} measurements")
+            float_metadata, profile_data, measurements = result
+            all_float_metadata.append(float_metadata)
+            all_profile_data.append(profile_data)
             
-        except Exception as e:
-            print(f"  ❌ Error processing float {float_id}: {e}")
-            continue
+            if len(measurements) > 0:
+                append_measurements_csv(measurements)
+                measurement_count += len(measurements)
+    
+    save_float_index(float_index)
     
-    return all_float_metadata, all_profile_data, all_measurements
+    all_profile_data = pd.concat(all_profile_data, ignore_index=True) if all_profile_data else pd.DataFrame()
+    return all_float_metadata, all_profile_data, measurement_count
 
-def save_to_csv_files(all_float_metadata, all_profile_data, all_measurements):
+def save_to_csv_files(all_float_metadata, all_profile_data, measurement_count):
     """Save extracted data to well-formatted CSV files"""
     print(f"\n💾 SAVING DATA TO CSV FILES")
     print("=" * 80)
     
     # Ensure the csv_files directory exists
-    csv_dir = "../csv_files"
+    csv_dir = CSV_DIR
     os.makedirs(csv_dir, exist_ok=True)
     
     files_created = []
@@ -294,7 +415,7 @@ def save_to_csv_files(all_float_metadata, all_profile_data, all_measurements):
     if all_float_metadata:
         df_floats = pd.DataFrame(all_float_metadata)
         float_path = os.path.join(csv_dir, "FLOAT.csv")
-        df_floats.to_csv(float_path, index=False)
+        write_csv(df_floats, float_path)
         files_created.append(f"FLOAT.csv ({len(df_floats)} floats)")
         print(f"✅ FLOAT.csv saved: {len(df_floats)} floats")
         
@@ -306,10 +427,10 @@ def save_to_csv_files(all_float_metadata, all_profile_data, all_measurements):
             print(df_floats[available_cols].head(3).to_string(index=False))
     
     # Save PROFILES.csv  
-    if all_profile_data:
-        df_profiles = pd.DataFrame(all_profile_data)
+    if len(all_profile_data) > 0:
+        df_profiles = all_profile_data
         profiles_path = os.path.join(csv_dir, "PROFILES.csv")
-        df_profiles.to_csv(profiles_path, index=False)
+        write_csv(df_profiles, profiles_path)
         files_created.append(f"PROFILES.csv ({len(df_profiles)} profiles)")
         print(f"\n✅ PROFILES.csv saved: {len(df_profiles)} profiles")
         
@@ -320,25 +441,24 @@ def save_to_csv_files(all_float_metadata, all_profile_data, all_measurements):
         if available_cols:
             print(df_profiles[available_cols].head(3).to_string(index=False))
     
-    # Save MEASUREMENTS.csv
-    if all_measurements:
-        df_measurements = pd.DataFrame(all_measurements)
-        measurements_path = os.path.join(csv_dir, "MEASUREMENTS.csv")
-        df_measurements.to_csv(measurements_path, index=False)
-        files_created.append(f"MEASUREMENTS.csv ({len(df_measurements)} measurements)")
-        print(f"\n✅ MEASUREMENTS.csv saved: {len(df_measurements)} measurements")
+    # MEASUREMENTS.csv was written float by float during extraction
+    if measurement_count > 0:
+        files_created.append(f"MEASUREMENTS.csv ({measurement_count} measurements)")
+        print(f"\n✅ MEASUREMENTS.csv saved: {measurement_count} measurements")
         
         # Show sample
         print("   Sample data:")
         sample_cols = ['FLOAT_ID', 'PROFILE_NUMBER', 'LEVEL', 'PRES', 'TEMP', 'PSAL']
-        available_cols = [col for col in sample_cols if col in df_measurements.columns]
-        if available_cols:
-            print(df_measurements[available_cols].head(5).to_string(index=False))
+        df_sample = pd.read_csv(MEASUREMENTS_PATH, nrows=5, usecols=sample_cols)
+        print(df_sample.to_string(index=False))
     
     return files_created
 
 def main():
     """Main extraction function"""
+    # Progress from worker threads goes through logging; set level=logging.DEBUG for per-profile counts
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     print("🌊 ARGO MULTI-FLOAT DATA EXTRACTOR v2.0")
     print("Based on data structure analysis")
     print("=" * 80)
@@ -354,12 +474,12 @@ def main():
     print(f"   DAC: {dac}")
     
     # Process all floats
-    all_float_metadata, all_profile_data, all_measurements = process_multiple_floats(
+    all_float_metadata, all_profile_data, measurement_count = process_multiple_floats(
         float_ids, dac=dac, max_profiles=max_profiles
     )
     
     # Save results
-    files_created = save_to_csv_files(all_float_metadata, all_profile_data, all_measurements)
+    files_created = save_to_csv_files(all_float_metadata, all_profile_data, measurement_count)
     
     # Final summary
     print(f"\n🎉 EXTRACTION COMPLETE!")
@@ -367,10 +487,10 @@ def main():
     print(f"📈 Final Results:")
     print(f"   Floats processed: {len(all_float_metadata)}")
     print(f"   Profiles extracted: {len(all_profile_data)}")
-    print(f"   Measurements recorded: {len(all_measurements)}")
+    print(f"   Measurements recorded: {measurement_count}")
     
-    if len(all_measurements) > 0 and len(all_profile_data) > 0:
-        avg_measurements = len(all_measurements) / len(all_profile_data)
+    if measurement_count > 0 and len(all_profile_data) > 0:
+        avg_measurements = measurement_count / len(all_profile_data)
         print(f"   Average measurements per profile: {avg_measurements:.1f}")
     
     print(f"\n📁 Files created:")
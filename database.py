@@ -1,18 +1,76 @@
 import duckdb
+from typing import List, Optional
+import pandas as pd
+import streamlit as st
 from models import QueryResult
 from config import config
 
+@st.cache_resource
+def get_connection(db_path: str) -> duckdb.DuckDBPyConnection:
+    # One read-only connection per process; queries run on their own cursors
+    return duckdb.connect(db_path, read_only=True)
+
+# Flag/ID columns repeat a handful of values; measurements stay float64 so no rounding noise is introduced
+CATEGORY_COLUMNS = {'FLOAT_ID', 'DIRECTION', 'DATA_MODE'}
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    dtypes = {col: 'category' for col in df.columns
+              if (col in CATEGORY_COLUMNS or col.endswith('_QC')) and df[col].dtype == object}
+    return df.astype(dtypes) if dtypes else df
+
+def normalize_sql(sql: str) -> str:
+    # Cache key cleanup that cannot change meaning: no case folding (string literals are
+    # case-sensitive) and no newline collapsing (it would swallow code after -- comments)
+    lines = [line.rstrip() for line in sql.strip().splitlines()]
+    # Trailing comment-only lines would hide the final semicolon from the strip below
+    while lines and (not lines[-1] or lines[-1].lstrip().startswith('--')):
+        lines.pop()
+    return "\n".join(lines).rstrip(';').rstrip()
+
+def _with_limit(sql: str, limit: int) -> str:
+    # Only a single plain query can be wrapped; a remaining ';' (multiple statements or
+    # one followed by an inline comment) would not parse inside the subquery, so run it as-is
+    if not sql.lower().startswith(('select', 'with')) or ';' in sql:
+        return sql
+    return f"SELECT * FROM (\n{sql}\n) AS limited LIMIT {int(limit)}"
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _run_sql(db_path: str, sql: str, limit: Optional[int] = None) -> pd.DataFrame:
+    # Errors propagate and are not cached; only successful results are memoized
+    if limit is not None:
+        sql = _with_limit(sql, limit)
+    cursor = get_connection(db_path).cursor()
+    try:
+        # Columnar fetch straight into numpy-backed columns, no list-of-tuples detour
+        return _downcast(cursor.execute(sql).fetch_df())
+    finally:
+        cursor.close()
+
 class DatabaseManager:
     def __init__(self):
         self.db_path = config.database_path
-    
-    def execute_query(self, sql: str) -> QueryResult:
-        conn = duckdb.connect(self.db_path)
+
+    def execute_query(self, sql: str, limit: Optional[int] = None) -> QueryResult:
         try:
-            result = conn.execute(sql).fetchall()
-            headers = [desc[0] for desc in conn.description]
-            return QueryResult(sql=sql, data=result, headers=headers, success=True)
+            sql = normalize_sql(sql)
+            if limit is None:
+                return QueryResult(sql=sql, data=_run_sql(self.db_path, sql), success=True)
+            # Fetch one extra row to tell whether the result was cut off
+            df = _run_sql(self.db_path, sql, limit + 1)
+            return QueryResult(sql=sql, data=df.iloc[:limit], success=True, truncated=len(df) > limit)
         except Exception as e:
-            return QueryResult(sql=sql, data=[("Error", str(e))], headers=["Error", "Details"], success=False, error=str(e))
-        finally:
-            conn.close()
\ No newline at end of file
+            # Column-wise construction skips per-row dtype inference; callers branch on success
+            # and never chart this frame
+            error_frame = pd.DataFrame({"Error": ["Error"], "Details": [str(e)]})
+            return QueryResult(sql=sql, data=error_frame, success=False, error=str(e))
+    
+    def aggregate_query(self, sql: str, group_columns: List[str]) -> QueryResult:
+        # DuckDB collapses repeated rows (e.g. one position per measurement) before they reach Plotly
+        sql = normalize_sql(sql)
+        if ';' in sql:
+            # Same rule as _with_limit: this SQL cannot be nested in a subquery
+            return QueryResult(sql=sql, data=pd.DataFrame(), success=False, error="SQL cannot be aggregated as a subquery")
+        columns = ", ".join(f'"{col}"' for col in group_columns)
+        return self.execute_query(
+            f"SELECT {columns}, COUNT(*) AS row_count FROM (\n{sql}\n) AS grouped GROUP BY {columns}"
+        )
@@ -1,8 +1,88 @@
 import streamlit as st
-import pandas as pd
-from orchestrator import orchestrator
+from orchestrator import OrchestratorService
+from sql_generator import ERROR_SQL
+from response_generator import ERROR_RESPONSE_PREFIX
 from models import ChartConfig
-from ui_components import UIComponents
+from ui_components import UIComponents, build_chart, dataframe_to_csv, detect_oceanographic_contexts
+
+def normalize_question(question: str) -> str:
+    # Only case, spacing and trailing ?/. are folded; operators, signs and quotes change meaning
+    return " ".join(question.lower().split()).rstrip("?. ")
+
+@st.cache_resource
+def get_orchestrator() -> OrchestratorService:
+    return OrchestratorService()
+
+class UncacheableResponse(Exception):
+    # Raised out of the cached function so Streamlit does not store a failed answer
+    def __init__(self, response):
+        super().__init__(response.error)
+        self.response = response
+
+def is_cacheable(response) -> bool:
+    # Transient Gemini failures surface as sentinel SQL/text rather than success=False
+    return (response.success and response.sql != ERROR_SQL
+            and not response.analysis.startswith(ERROR_RESPONSE_PREFIX))
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def cached_process_question(question_key: str, _question: str):
+    # Only question_key is hashed; leading-underscore args are skipped by Streamlit
+    response = get_orchestrator().process_question(_question)
+    if not is_cacheable(response):
+        raise UncacheableResponse(response)
+    return response
+
+def process_question(question: str):
+    try:
+        return cached_process_question(normalize_question(question), question)
+    except UncacheableResponse as e:
+        return e.response
+
+@st.fragment
+def render_assistant_message(ui: UIComponents, i: int, content):
+    # Widgets in this message (SQL editor, chart selectors, download) rerun only this fragment
+    with st.chat_message("assistant"):
+        st.markdown("### Analysis")
+        st.markdown(content.analysis)
+        
+        if content.success:
+            df = content.results
+            
+            # Show data metrics
+            ui.show_data_metrics(df, content.numeric_columns)
+            
+            # Show SQL query with edit option
+            edited_sql = ui.show_sql_editor(content.sql, content.question, i)
+            if edited_sql:
+                # Handle re-running query with edited SQL
+                pass
+            
+            # Create and show chart if config exists
+            if content.chart_config:
+                chart = build_chart(content.sql, df, content.chart_config, content.numeric_columns,
+                                    get_orchestrator().db_manager)
+                if chart:
+                    st.plotly_chart(chart, use_container_width=True, key=f"chart_{i}")
+            
+            # Show data table
+            st.dataframe(content.preview)
+            
+            # Allow custom chart creation
+            custom_chart = ui.create_custom_chart_selector(df, content.numeric_columns, i)
+            if custom_chart:
+                st.plotly_chart(custom_chart, use_container_width=True, key=f"custom_chart_{i}")
+            
+            # Add download button; a truncated result is fetched in full only on request
+            if content.truncated:
+                st.info(f"Showing the first {len(df)} rows of a larger result.")
+                if st.button("Prepare full dataset", key=f"full_{i}"):
+                    full_result = get_orchestrator().db_manager.execute_query(content.sql)
+                    if full_result.success:
+                        ui.create_download_button(dataframe_to_csv(full_result.data), i)
+                    else:
+                        st.error(full_result.error)
+            else:
+                ui.create_download_button(content.csv_data, i)
 
 def main():
     st.set_page_config(page_title="Argo Oceanographic Analyst", page_icon="🌊", layout="wide")
@@ -19,12 +99,16 @@ def main():
     
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
+    if 'question_contexts' not in st.session_state:
+        st.session_state.question_contexts = {}
     
     if user_input := st.chat_input("Ask an oceanographic question..."):
+        # Context tags are detected once here and looked up by history index when rendering
+        st.session_state.question_contexts[len(st.session_state.chat_history)] = detect_oceanographic_contexts(user_input)
         st.session_state.chat_history.append(("user", user_input))
         
         with st.spinner("Processing..."):
-            response = orchestrator.process_question(user_input)
+            response = process_question(user_input)
         
         st.session_state.chat_history.append(("assistant", response))
     
@@ -32,40 +116,9 @@ def main():
         if msg_type == "user":
             st.chat_message("user").write(content)
             # Show oceanographic contexts for the question
-            ui.show_oceanographic_contexts(content)
+            ui.show_oceanographic_contexts(st.session_state.question_contexts.get(i, ()))
         else:
-            with st.chat_message("assistant"):
-                st.markdown("### Analysis")
-                st.markdown(content.analysis)
-                
-                if content.success:
-                    df = pd.DataFrame(content.results, columns=content.headers)
-                    
-                    # Show data metrics
-                    ui.show_data_metrics(df)
-                    
-                    # Show SQL query with edit option
-                    edited_sql = ui.show_sql_editor(content.sql, content.question, i)
-                    if edited_sql:
-                        # Handle re-running query with edited SQL
-                        pass
-                    
-                    # Create and show chart if config exists
-                    if content.chart_config:
-                        chart = ui.create_chart(df, content.chart_config)
-                        if chart:
-                            st.plotly_chart(chart, use_container_width=True)
-                    
-                    # Show data table
-                    st.dataframe(df.head(50))
-                    
-                    # Allow custom chart creation
-                    custom_chart = ui.create_custom_chart_selector(df, i)
-                    if custom_chart:
-                        st.plotly_chart(custom_chart, use_container_width=True)
-                    
-                    # Add download button
-                    ui.create_download_button(df, i)
+            render_assistant_message(ui, i, content)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
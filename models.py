@@ -1,13 +1,23 @@
 from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Dict, Optional, Tuple, Any
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+PREVIEW_ROWS = 50
 
 @dataclass
 class QueryResult:
     sql: str
-    data: List[Tuple]
-    headers: List[str]
+    data: pd.DataFrame
     success: bool
     error: Optional[str] = None
+    truncated: bool = False
+    
+    @property
+    def headers(self) -> List[str]:
+        return list(self.data.columns)
 
 @dataclass
 class AnalysisResult:
@@ -36,9 +46,28 @@ class ChartConfig:
 class OceanographicResponse:
     question: str
     sql: str
-    results: List[Tuple]
-    headers: List[str]
+    results: pd.DataFrame
     analysis: str
     chart_config: Optional[ChartConfig]
     success: bool
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+    truncated: bool = False
+    
+    @property
+    def headers(self) -> List[str]:
+        return list(self.results.columns)
+    
+    @cached_property
+    def numeric_columns(self) -> Tuple[str, ...]:
+        # Computed once per response and passed to every chart/metrics helper
+        return tuple(self.results.select_dtypes(include=[np.number]).columns)
+    
+    @cached_property
+    def preview(self) -> pa.Table:
+        # Arrow table handed straight to st.dataframe, skipping the per-rerun pandas conversion
+        return pa.Table.from_pandas(self.results.iloc[:PREVIEW_ROWS], preserve_index=False)
+    
+    @cached_property
+    def csv_data(self) -> bytes:
+        # Serialized at most once per response; no per-rerun DataFrame hashing
+        return self.results.to_csv(index=False).encode('utf-8')
\ No newline at end of file
@@ -1,3 +1,4 @@
+import pandas as pd
 from models import OceanographicResponse
 from config import config
 from database import DatabaseManager
@@ -24,12 +25,12 @@ class OrchestratorService:
     def process_question(self, user_question: str) -> OceanographicResponse:
         try:
             sql = self.sql_generator.generate_sql(user_question, self.semantic_model)
-            query_result = self.db_manager.execute_query(sql)
+            query_result = self.db_manager.execute_query(sql, limit=config.max_result_rows)
             
             if not query_result.success:
                 return OceanographicResponse(
                     question=user_question, sql=sql, results=query_result.data,
-                    headers=query_result.headers, analysis=f"Query failed: {query_result.error}",
+                    analysis=f"Query failed: {query_result.error}",
                     chart_config=None, success=False, error=query_result.error
                 )
             
@@ -39,14 +40,12 @@ class OrchestratorService:
             
             return OceanographicResponse(
                 question=user_question, sql=sql, results=query_result.data,
-                headers=query_result.headers, analysis=text_response,
-                chart_config=chart_config, success=True
+                analysis=text_response,
+                chart_config=chart_config, success=True, truncated=query_result.truncated
             )
         except Exception as e:
             return OceanographicResponse(
-                question=user_question, sql=f"-- Error: {str(e)}", results=[],
-                headers=[], analysis=f"Error: {str(e)}", chart_config=None,
+                question=user_question, sql=f"-- Error: {str(e)}", results=pd.DataFrame(),
+                analysis=f"Error: {str(e)}", chart_config=None,
                 success=False, error=str(e)
-            )
-
-orchestrator = OrchestratorService()
\ No newline at end of file
+            )
\ No newline at end of file
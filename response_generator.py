@@ -2,6 +2,8 @@ import google.generativeai as genai
 from models import AnalysisResult
 from config import config
 
+ERROR_RESPONSE_PREFIX = "Error generating response:"
+
 class ResponseGenerator:
     def __init__(self):
         genai.configure(api_key=config.google_api_key)
@@ -20,7 +22,7 @@ class ResponseGenerator:
             response = self.model.generate_content(prompt)
             return response.text.strip()
         except Exception as e:
-            return f"Error generating response: {str(e)}"
+            return f"{ERROR_RESPONSE_PREFIX} {str(e)}"
     
     def _create_analysis_prompt(self, question: str, analysis: AnalysisResult) -> str:
         context = f"""
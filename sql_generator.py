@@ -2,6 +2,8 @@ import google.generativeai as genai
 from config import config
 from typing import Dict, Any
 
+ERROR_SQL = "SELECT 'Error generating SQL' AS error;"
+
 class SQLGenerator:
     def __init__(self):
         genai.configure(api_key=config.google_api_key)
@@ -89,6 +91,7 @@ Important Guidelines:
 9. Use clear column aliasing for better readability
 10. Format the SQL query with proper indentation and line breaks
 11. For time-based queries, use JULD column (timestamp format)
+    - LAUNCH_DATE, START_DATE, END_MISSION_DATE are VARCHAR in YYYYMMDDHHMMSS format: always convert them in SQL with strptime(col, '%Y%m%d%H%M%S') so results come back as timestamps
 12. Use PRES column for depth/pressure measurements
 13. Use TEMP, PSAL columns for temperature and salinity
 14. Consider using adjusted values (*_ADJUSTED columns) for scientific accuracy
@@ -113,4 +116,4 @@ Generate only the SQL query without any explanations. The query should be valid
             return sql
         except Exception as e:
             print(f"Error from Gemini: {e}")
-            return "SELECT 'Error generating SQL' AS error;"
\ No newline at end of file
+            return ERROR_SQL
\ No newline at end of file
@@ -1,49 +1,131 @@
+import re
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
-from typing import List, Optional
+from typing import Optional, Tuple
 from models import OceanographicResponse, ChartConfig
+from database import DatabaseManager
+
+MAX_PLOT_POINTS = 2000
+
+OCEANOGRAPHIC_CONTEXTS = {
+    'water_mass': ['water mass', 't-s diagram', 'temperature salinity', 'potential temperature'],
+    'vertical_structure': ['thermocline', 'temperature gradient', 'stratification', 'mixed layer'],
+    'spatial_analysis': ['geographic', 'spatial', 'location', 'regional', 'map', 'across', 'vary'],
+    'temporal_analysis': ['time series', 'seasonal', 'temporal', 'over time', 'trend'],
+    'quality_control': ['quality', 'qc', 'data quality', 'flags'],
+    'profile_analysis': ['profile', 'depth', 'vertical', 'pressure', 'surface', 'deepest', 'temperature difference']
+}
+
+# One named group per context, scanned in a single pass; the lookahead lets overlapping
+# keywords ('data quality' / 'quality') all match
+CONTEXT_PATTERN = re.compile('(?=' + '|'.join(
+    f"(?P<{context}>{'|'.join(re.escape(keyword) for keyword in keywords)})"
+    for context, keywords in OCEANOGRAPHIC_CONTEXTS.items()
+) + ')')
+
+def detect_oceanographic_contexts(question: str) -> Tuple[str, ...]:
+    # Called once per question at submit time; the result is kept in session state
+    matched = {match.lastgroup for match in CONTEXT_PATTERN.finditer(question.lower())}
+    return tuple(context for context in OCEANOGRAPHIC_CONTEXTS if context in matched)
+
+# Only full, untruncated result sets land here, so keep just a few of them
+@st.cache_data(max_entries=8, show_spinner=False)
+def dataframe_to_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_chart(sql: str, _df: pd.DataFrame, chart_config: ChartConfig, numeric_cols: Tuple[str, ...],
+                _db_manager: Optional[DatabaseManager] = None) -> Optional[go.Figure]:
+    # Keyed on the SQL text and chart config; the result frame and db manager are not hashed
+    if chart_config is not None and chart_config.chart_type == 'scatter_geo' and _db_manager is not None:
+        # Plot one marker per distinct position, aggregated in the database; the fallback to
+        # raw rows depends only on the SQL, so the cached figure is the same on every run
+        group_cols = [col for col in (chart_config.lat_column, chart_config.lon_column, 'FLOAT_ID')
+                      if col in _df.columns]
+        points = _db_manager.aggregate_query(sql, group_cols)
+        if points.success:
+            _df = points.data
+    return UIComponents.create_chart(_df, chart_config, numeric_cols)
 
 class UIComponents:
     @staticmethod
-    def show_oceanographic_contexts(question: str) -> List[str]:
-        if not question:
-            return ['general']
-            
-        question_lower = question.lower()
+    def downsample_for_plot(df: pd.DataFrame, x_col: str, y_col: str, max_points: int = MAX_PLOT_POINTS) -> pd.DataFrame:
+        # Largest-Triangle-Three-Buckets: keeps the visual shape with far fewer points
+        if len(df) <= max_points or max_points < 3:
+            return df
+        if not (pd.api.types.is_numeric_dtype(df[x_col]) and pd.api.types.is_numeric_dtype(df[y_col])):
+            return df
         
-        contexts = {
-            'water_mass': ['water mass', 't-s diagram', 'temperature salinity', 'potential temperature'],
-            'vertical_structure': ['thermocline', 'temperature gradient', 'stratification', 'mixed layer'],
-            'spatial_analysis': ['geographic', 'spatial', 'location', 'regional', 'map', 'across', 'vary'],
-            'temporal_analysis': ['time series', 'seasonal', 'temporal', 'over time', 'trend'],
-            'quality_control': ['quality', 'qc', 'data quality', 'flags'],
-            'profile_analysis': ['profile', 'depth', 'vertical', 'pressure', 'surface', 'deepest', 'temperature difference']
-        }
+        df = df.dropna(subset=[x_col, y_col])
+        n = len(df)
+        if n <= max_points:
+            return df
         
-        detected_contexts = []
-        for context, keywords in contexts.items():
-            if any(keyword in question_lower for keyword in keywords):
-                detected_contexts.append(context)
+        x = df[x_col].to_numpy(dtype=float)
+        y = df[y_col].to_numpy(dtype=float)
+        edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
         
-        if detected_contexts:
-            context_tags = " ".join([f"`{ctx}`" for ctx in detected_contexts])
+        indices = np.empty(max_points, dtype=np.int64)
+        indices[0], indices[-1] = 0, n - 1
+        a = 0
+        for b in range(max_points - 2):
+            start, end = edges[b], edges[b + 1]
+            next_end = edges[b + 2] if b + 2 < len(edges) else n
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+            area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+            a = start + int(area.argmax())
+            indices[b + 1] = a
+        
+        return df.iloc[indices]
+    
+    @staticmethod
+    def show_oceanographic_contexts(contexts: Tuple[str, ...]):
+        if contexts:
+            context_tags = " ".join([f"`{ctx}`" for ctx in contexts])
             st.markdown(f"**Oceanographic Context:** {context_tags}")
+    
+    @staticmethod
+    def profile_line_trace(df: pd.DataFrame, x_col: str, y_col: str) -> go.Scattergl:
+        # One WebGL trace for every profile; a gap row between profiles breaks the line,
+        # which renders far faster than one trace per float/profile
+        group_cols = [col for col in ('FLOAT_ID', 'PROFILE_NUMBER') if col in df.columns]
+        if not group_cols or df.empty:
+            return go.Scattergl(x=df[x_col], y=df[y_col], mode='lines')
+        
+        # Stable sort keeps the in-profile row order while making each profile contiguous,
+        # then one NaN goes in at every group boundary
+        ordered = df.sort_values(group_cols, kind='stable')
+        codes = ordered.groupby(group_cols, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        
+        group_keys = ordered[group_cols].iloc[np.r_[0, boundaries]].astype(str)
+        group_labels = group_keys.apply(" / ".join, axis=1).to_numpy()
         
-        return detected_contexts if detected_contexts else ['general']
+        x_values = np.insert(pd.to_numeric(ordered[x_col], errors='coerce').to_numpy(dtype=float), boundaries, np.nan)
+        y_values = np.insert(pd.to_numeric(ordered[y_col], errors='coerce').to_numpy(dtype=float), boundaries, np.nan)
+        labels = np.insert(group_labels[codes].astype(object), boundaries, "")
+        
+        return go.Scattergl(x=x_values, y=y_values, mode='lines', text=labels,
+                            hovertemplate=f"%{{text}}<br>{x_col}=%{{x}}<br>{y_col}=%{{y}}<extra></extra>")
     
     @staticmethod
-    def create_chart(df: pd.DataFrame, chart_config: ChartConfig) -> Optional[go.Figure]:
+    def create_chart(df: pd.DataFrame, chart_config: ChartConfig, numeric_cols: Tuple[str, ...]) -> Optional[go.Figure]:
         if chart_config is None or df.empty:
             return None
         
         try:
+            if chart_config.chart_type in ('line', 'scatter'):
+                df = UIComponents.downsample_for_plot(df, chart_config.x_axis, chart_config.y_axis)
+            
             if chart_config.chart_type == 'line':
-                fig = px.line(df, x=chart_config.x_axis, y=chart_config.y_axis, 
-                             title=chart_config.title)
+                fig = go.Figure(UIComponents.profile_line_trace(df, chart_config.x_axis, chart_config.y_axis))
+                fig.update_layout(title=chart_config.title, xaxis_title=chart_config.x_axis,
+                                  yaxis_title=chart_config.y_axis)
                 
                 if chart_config.y_reversed:
                     fig.update_yaxes(autorange="reversed")
@@ -55,7 +137,7 @@ class UIComponents:
                     
             elif chart_config.chart_type == 'scatter':
                 fig = px.scatter(df, x=chart_config.x_axis, y=chart_config.y_axis, 
-                               title=chart_config.title)
+                               title=chart_config.title, render_mode='webgl')
                 
                 if chart_config.x_label:
                     fig.update_xaxes(title_text=chart_config.x_label)
@@ -63,12 +145,15 @@ class UIComponents:
                     fig.update_yaxes(title_text=chart_config.y_label)
                     
             elif chart_config.chart_type == 'scatter_geo':
-                fig = px.scatter_geo(df, lat=chart_config.lat_column, lon=chart_config.lon_column, 
-                                   title=chart_config.title)
+                # Built directly from numpy arrays; px.scatter_geo re-inspects the frame on every call
+                lat = pd.to_numeric(df[chart_config.lat_column], errors='coerce').to_numpy(dtype=float)
+                lon = pd.to_numeric(df[chart_config.lon_column], errors='coerce').to_numpy(dtype=float)
+                text = df['FLOAT_ID'].astype(str).to_numpy() if 'FLOAT_ID' in df.columns else None
+                fig = go.Figure(go.Scattergeo(lat=lat, lon=lon, mode='markers', text=text))
+                fig.update_layout(title=chart_config.title)
                 fig.update_geos(projection_type="natural earth")
                 
             else:
-                numeric_cols = df.select_dtypes(include=[np.number]).columns
                 if len(numeric_cols) >= 2:
                     fig = px.scatter(df, x=numeric_cols[0], y=numeric_cols[1], 
                                    title=chart_config.title)
@@ -82,7 +167,7 @@ class UIComponents:
             return None
     
     @staticmethod
-    def show_data_metrics(df: pd.DataFrame):
+    def show_data_metrics(df: pd.DataFrame, numeric_cols: Tuple[str, ...]):
         col1, col2, col3 = st.columns(3)
         
         with col1:
@@ -90,13 +175,10 @@ class UIComponents:
         with col2:
             st.metric("Columns", len(df.columns))
         with col3:
-            numeric_cols = len(df.select_dtypes(include=[np.number]).columns)
-            st.metric("Numeric Columns", numeric_cols)
+            st.metric("Numeric Columns", len(numeric_cols))
     
     @staticmethod
-    def create_custom_chart_selector(df: pd.DataFrame, i: int) -> Optional[go.Figure]:
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        
+    def create_custom_chart_selector(df: pd.DataFrame, numeric_cols: Tuple[str, ...], i: int) -> Optional[go.Figure]:
         if len(numeric_cols) < 2:
             st.info("Need at least 2 numeric columns for custom charts")
             return None
@@ -112,6 +194,7 @@ class UIComponents:
             chart_type = st.selectbox("Chart Type", ["Scatter", "Line"], key=f"custom_type_{i}")
         
         if st.button("Create Chart", key=f"create_chart_{i}"):
+            df = UIComponents.downsample_for_plot(df, x_col, y_col)
             if chart_type == "Scatter":
                 custom_fig = px.scatter(df, x=x_col, y=y_col, 
                                       title=f"Custom: {y_col} vs {x_col}")
@@ -196,12 +279,12 @@ Use flags 1 & 2 for analysis
             """)
     
     @staticmethod
-    def create_download_button(df: pd.DataFrame, i: int):
-        csv = df.to_csv(index=False)
+    def create_download_button(csv_data: bytes, i: int):
         st.download_button(
             "Download Dataset",
-            csv,
+            csv_data,
             f"argo_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             "text/csv",
-            key=f"download_{i}"
+            key=f"download_{i}",
+            on_click="ignore"
         )
\ No newline at end of file